@@ -25,6 +25,9 @@ class Config:
     # Optional: Data Directory
     DATA_DIR: Optional[str] = os.getenv("DATA_DIR")
     
+    # Optional: Directory for transient Manim code files (defaults to tmpfs when available)
+    CODE_DIR: Optional[str] = os.getenv("CODE_DIR")
+    
     # Server Configuration
     HOST: str = os.getenv("HOST", "127.0.0.1")
     PORT: int = int(os.getenv("PORT", "8000"))
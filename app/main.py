@@ -59,9 +59,9 @@ videos_dir = Path(__file__).parent / "storage" / "videos"
 videos_dir.mkdir(parents=True, exist_ok=True)
 app.mount("/static/videos", StaticFiles(directory=str(videos_dir)), name="videos")
 
-@app.get("/health")
+@app.api_route("/health", methods=["GET", "HEAD"])
 async def health_check():
-    """Health check endpoint to verify the server is running."""
+    """Health check endpoint to verify the server is running (HEAD for body-less probes)."""
     return JSONResponse(
         status_code=200,
         content={
@@ -103,8 +103,8 @@ class JobStore(BaseModel):
     status: Literal["queued", "rendering", "ready", "error"]
     filename: str
     code: str
-    created_at: str
-    updated_at: str
+    created_at: float  # Unix timestamp, formatted only when emitted
+    updated_at: float  # Unix timestamp, formatted only when emitted
     video_path: Optional[str] = None
     error_message: Optional[str] = None
 
@@ -3,7 +3,7 @@ API routes for the AI Tutor backend.
 Defines all endpoints with their request/response contracts.
 """
 from fastapi import APIRouter, HTTPException, status, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from datetime import datetime
 import logging
 import time
@@ -229,6 +229,48 @@ async def get_render_status(job_id: str) -> RenderJob:
         )
 
 
+@api_router.get("/render/{job_id}/stream")
+async def stream_render_status(job_id: str, timeout: int = 300) -> StreamingResponse:
+    """
+    Stream rendering job status as server-sent events.
+    
+    Sends the current status immediately, then the final status once the
+    job completes, so clients don't need to poll.
+    
+    Args:
+        job_id: Unique job identifier
+        timeout: Maximum seconds to wait for completion (default 300, max 600)
+        
+    Returns:
+        Event stream of RenderJob payloads
+    """
+    job_status = render_service.get_job_status(job_id)
+    
+    if not job_status:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Job {job_id} not found"
+        )
+    
+    # Limit to reasonable bounds
+    timeout = min(max(1, timeout), 600)
+    
+    async def event_stream():
+        yield f"data: {job_status.json()}\n\n"
+        
+        if job_status.status in ["queued", "rendering"]:
+            final_status = await render_service.await_completion(job_id, timeout)
+            # On timeout the job is still pending; close without a second event
+            if final_status and final_status.status in ["ready", "error"]:
+                yield f"data: {final_status.json()}\n\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"}
+    )
+
+
 # Topic endpoints for frontend
 @api_router.get("/topics/suggestions")
 async def get_topic_suggestions(limit: int = 12):
@@ -5,8 +5,9 @@ Provides job metrics, system health, and operational insights.
 from fastapi import APIRouter, HTTPException
 from typing import Dict, List, Any
 import logging
+import time
 
-from app.services.job_store import enhanced_job_store
+from app.services.job_store import enhanced_job_store, format_timestamp
 from app.services.render_service import render_service
 from app.services.validation_service import validation_service
 from app.services.logging_service import logger as structured_logger
@@ -69,8 +70,8 @@ async def get_job_queue() -> Dict[str, Any]:
                 "id": job.id,
                 "filename": job.filename,
                 "status": job.status,
-                "created_at": job.created_at,
-                "updated_at": job.updated_at
+                "created_at": format_timestamp(job.created_at),
+                "updated_at": format_timestamp(job.updated_at)
             }
         
         return {
@@ -149,7 +150,7 @@ async def get_system_health() -> Dict[str, Any]:
         stuck_jobs = [
             job for job in active_jobs 
             if job.status == "rendering" and 
-            (datetime.utcnow() - datetime.fromisoformat(job.updated_at)).total_seconds() > 300
+            time.time() - job.updated_at > 300
         ]
         
         if stuck_jobs:
@@ -210,8 +211,8 @@ async def get_job_details(job_id: str) -> Dict[str, Any]:
             "id": job.id,
             "status": job.status,
             "filename": job.filename,
-            "created_at": job.created_at,
-            "updated_at": job.updated_at,
+            "created_at": format_timestamp(job.created_at),
+            "updated_at": format_timestamp(job.updated_at),
             "video_path": job.video_path,
             "error_message": job.error_message
         }
@@ -223,9 +224,7 @@ async def get_job_details(job_id: str) -> Dict[str, Any]:
         
         # Add timing info for completed jobs
         if job.status in ["ready", "error"]:
-            created_time = datetime.fromisoformat(job.created_at)
-            updated_time = datetime.fromisoformat(job.updated_at)
-            job_info["total_processing_time_seconds"] = (updated_time - created_time).total_seconds()
+            job_info["total_processing_time_seconds"] = job.updated_at - job.created_at
         
         return job_info
         
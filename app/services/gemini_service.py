@@ -21,9 +21,18 @@ class GeminiService:
         if not config.GEMINI_API_KEY:
             raise ValueError("GEMINI_API_KEY is required")
             
+        self.configure_client()
+        logger.info("Gemini service initialized")
+    
+    def configure_client(self):
+        """
+        (Re)create the Gemini client and model.
+        
+        Called again in forked workers (Gunicorn preload_app) so each process
+        gets its own connection instead of sharing the parent's gRPC channel.
+        """
         genai.configure(api_key=config.GEMINI_API_KEY)
         self.model = genai.GenerativeModel('gemini-1.5-flash')
-        logger.info("Gemini service initialized")
     
     def _clean_json_response(self, response_text: str) -> str:
         """
@@ -5,14 +5,20 @@ Extends the basic job storage with production-ready features.
 import time
 import logging
 from typing import Dict, List, Optional, Any
-from datetime import datetime, timedelta
-from dataclasses import dataclass, asdict
+from datetime import datetime
+from dataclasses import dataclass
 from collections import defaultdict
 
 from app.models import JobStore, RenderJob
 
 logger = logging.getLogger(__name__)
 
+def format_timestamp(timestamp: Optional[float]) -> Optional[str]:
+    """Format a Unix timestamp as an ISO string for API output."""
+    if timestamp is None:
+        return None
+    return datetime.utcfromtimestamp(timestamp).isoformat()
+
 @dataclass
 class JobMetrics:
     """Metrics for job monitoring and observability."""
@@ -89,7 +95,7 @@ class EnhancedJobStore:
                 setattr(job, field, value)
         
         # Always update timestamp
-        job.updated_at = datetime.utcnow().isoformat()
+        job.updated_at = time.time()
         
         # Log status changes
         new_status = job.status
@@ -126,13 +132,11 @@ class EnhancedJobStore:
     
     def _archive_job(self, job: JobStore) -> None:
         """Archive completed job to history."""
-        job_data = asdict(job)
-        job_data["completed_at"] = datetime.utcnow().isoformat()
+        job_data = job.dict()
+        job_data["completed_at"] = time.time()
         
         # Calculate processing times
-        created_time = datetime.fromisoformat(job.created_at)
-        completed_time = datetime.utcnow()
-        job_data["total_processing_time"] = (completed_time - created_time).total_seconds()
+        job_data["total_processing_time"] = job_data["completed_at"] - job.created_at
         
         self._job_history.append(job_data)
         
@@ -150,12 +154,11 @@ class EnhancedJobStore:
         Returns:
             Number of jobs cleaned up
         """
-        current_time = datetime.utcnow()
+        current_time = time.time()
         jobs_to_remove = []
         
         for job_id, job in self._jobs.items():
-            job_time = datetime.fromisoformat(job.created_at)
-            age_hours = (current_time - job_time).total_seconds() / 3600
+            age_hours = (current_time - job.created_at) / 3600
             
             if age_hours > max_age_hours:
                 jobs_to_remove.append(job_id)
@@ -165,10 +168,10 @@ class EnhancedJobStore:
             self.remove_job(job_id)
         
         # Clean up old history too
-        history_cutoff = current_time - timedelta(hours=max_age_hours * 7)  # Keep history 7x longer
+        history_cutoff = current_time - max_age_hours * 7 * 3600  # Keep history 7x longer
         self._job_history = [
             job for job in self._job_history 
-            if datetime.fromisoformat(job.get("completed_at", job["created_at"])) > history_cutoff
+            if job.get("completed_at", job["created_at"]) > history_cutoff
         ]
         
         if jobs_to_remove:
@@ -235,10 +238,12 @@ class EnhancedJobStore:
         last_job_completed = None
         
         if self._jobs:
-            last_job_created = max(job.created_at for job in self._jobs.values())
+            last_job_created = format_timestamp(max(job.created_at for job in self._jobs.values()))
         
         if self._job_history:
-            last_job_completed = max(job.get("completed_at", job["created_at"]) for job in self._job_history)
+            last_job_completed = format_timestamp(
+                max(job.get("completed_at", job["created_at"]) for job in self._job_history)
+            )
         
         return JobMetrics(
             total_jobs=total_jobs,
@@ -265,7 +270,14 @@ class EnhancedJobStore:
         Returns:
             List of completed job records
         """
-        return self._job_history[-limit:]
+        history = []
+        for job_data in self._job_history[-limit:]:
+            record = dict(job_data)
+            for field in ("created_at", "updated_at", "completed_at"):
+                if field in record:
+                    record[field] = format_timestamp(record[field])
+            history.append(record)
+        return history
     
     def get_queue_position(self, job_id: str) -> Optional[int]:
         """
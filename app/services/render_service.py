@@ -3,14 +3,18 @@ Render service for Manim animation processing.
 Handles job creation, file management, and Manim CLI execution.
 """
 import os
+import re
+import errno
+import stat
+import time
 import uuid
 import asyncio
 import subprocess
 import logging
-from datetime import datetime
 from typing import Dict, Optional, List
 from pathlib import Path
 import shutil
+from collections import deque
 
 from app.config import config
 from app.models import RenderJob, JobStore
@@ -18,6 +22,41 @@ from app.services.job_store import enhanced_job_store
 
 logger = logging.getLogger(__name__)
 
+# Manim output is only kept for diagnostics, so retain just the tail of each stream
+OUTPUT_CHUNK_SIZE = 4096
+OUTPUT_TAIL_CHUNKS = 16  # ~64KB per stream
+
+# Errors that mean O_TMPFILE writes can't work here, by the step that raised them
+_TMPFILE_UNSUPPORTED_ERRNOS = {
+    "tmpfile": {errno.EOPNOTSUPP, errno.EISDIR, errno.EINVAL},
+    "link": {errno.ENOENT, errno.EXDEV},
+}
+
+# Class definitions; group 2 is set when the class inherits directly from Scene
+_CLASS_RE = re.compile(r'class\s+(\w+)\s*\((\s*Scene\s*\))?')
+
+async def _read_tail(stream: Optional[asyncio.StreamReader]) -> bytes:
+    """
+    Drain a subprocess stream, keeping only its last few chunks.
+    
+    Args:
+        stream: Subprocess output stream (None if not piped)
+        
+    Returns:
+        Tail of the stream output
+    """
+    if stream is None:
+        return b""
+    
+    tail = deque(maxlen=OUTPUT_TAIL_CHUNKS)
+    while True:
+        chunk = await stream.read(OUTPUT_CHUNK_SIZE)
+        if not chunk:
+            break
+        tail.append(chunk)
+    
+    return b"".join(tail)
+
 class RenderService:
     """Service for managing Manim animation rendering."""
     
@@ -26,12 +65,21 @@ class RenderService:
         # Storage directories
         self.base_dir = Path(__file__).parent.parent.parent
         self.storage_dir = self.base_dir / "app" / "storage"
-        self.code_dir = self.storage_dir / "code"
+        self.code_dir = self._resolve_code_dir()
         self.videos_dir = self.storage_dir / "videos"
         
+        # Resolve Manim executable once rather than searching PATH per render
+        self._manim_bin = shutil.which("manim") or "manim"
+        
+        # Write code files through O_TMPFILE where the platform supports it
+        self._use_tmpfile = hasattr(os, "O_TMPFILE")
+        
         # Use enhanced job store
         self.job_store = enhanced_job_store
         
+        # Completion events so clients can wait instead of polling
+        self._events: Dict[str, asyncio.Event] = {}
+        
         # Ensure directories exist
         self._ensure_directories()
         
@@ -39,18 +87,73 @@ class RenderService:
         logger.info(f"Code directory: {self.code_dir}")
         logger.info(f"Videos directory: {self.videos_dir}")
     
+    def _resolve_code_dir(self) -> Path:
+        """
+        Resolve directory for transient code files.
+        
+        Code files only live for the duration of a render, so prefer
+        memory-backed tmpfs over on-disk storage when it is available.
+        
+        Returns:
+            Directory for code files
+        """
+        if config.CODE_DIR:
+            return Path(config.CODE_DIR)
+        
+        # /dev/shm is world-writable, so only use it through a directory that
+        # this user owns and nobody else can enter; Manim executes these files
+        shm_dir = Path("/dev/shm/ai_tutor")
+        if os.path.isdir("/dev/shm"):
+            if self._ensure_private_dir(shm_dir):
+                return shm_dir / "code"
+            logger.warning(f"{shm_dir} is not a private directory, using on-disk code storage")
+        
+        return self.storage_dir / "code"
+    
+    @staticmethod
+    def _ensure_private_dir(path: Path) -> bool:
+        """
+        Create a directory only the current user can access.
+        
+        Args:
+            path: Directory to create or reuse
+            
+        Returns:
+            True if path is a real directory (not a symlink) owned by this user
+            with no group or other permissions
+        """
+        try:
+            path.mkdir(mode=0o700, exist_ok=True)
+            st = os.lstat(path)
+        except OSError as e:
+            logger.warning(f"Cannot create {path}: {e}")
+            return False
+        
+        return (
+            stat.S_ISDIR(st.st_mode)
+            and st.st_uid == os.getuid()
+            and stat.S_IMODE(st.st_mode) & 0o077 == 0
+        )
+    
     def _ensure_directories(self):
         """Ensure all required directories exist."""
         self.code_dir.mkdir(parents=True, exist_ok=True)
         self.videos_dir.mkdir(parents=True, exist_ok=True)
         
-        # Create .gitkeep files if directories are empty
-        if not any(self.code_dir.iterdir()):
+        # Create .gitkeep files if directories are empty; tmpfs code
+        # directories are outside the repo and need none
+        if self.code_dir.is_relative_to(self.storage_dir) and self._is_empty_dir(self.code_dir):
             (self.code_dir / ".gitkeep").write_text("# Temp Manim code files")
         
-        if not any(self.videos_dir.iterdir()):
+        if self._is_empty_dir(self.videos_dir):
             (self.videos_dir / ".gitkeep").write_text("# Rendered video files")
     
+    @staticmethod
+    def _is_empty_dir(path: Path) -> bool:
+        """Check whether a directory is empty without listing all of it."""
+        with os.scandir(path) as it:
+            return next(it, None) is None
+    
     def _generate_job_id(self) -> str:
         """Generate unique job ID."""
         return str(uuid.uuid4())
@@ -66,9 +169,9 @@ class RenderService:
         Returns:
             Safe file path
         """
-        # Add timestamp to prevent conflicts
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        safe_filename = f"{filename}_{timestamp}{extension}"
+        # Add nanosecond timestamp suffix to prevent conflicts
+        suffix = f"{time.time_ns():x}"
+        safe_filename = f"{filename}_{suffix}{extension}"
         
         if extension == ".py":
             return self.code_dir / safe_filename
@@ -91,7 +194,8 @@ class RenderService:
         code_path = self._get_safe_filepath(filename, ".py")
         
         try:
-            code_path.write_text(code, encoding="utf-8")
+            if not self._write_linked_tmpfile(code_path, code.encode("utf-8")):
+                code_path.write_text(code, encoding="utf-8")
             logger.info(f"Saved code file: {code_path}")
             return code_path
             
@@ -99,6 +203,58 @@ class RenderService:
             logger.error(f"Failed to save code file: {e}")
             raise ValueError(f"Failed to save code file: {e}")
     
+    def _write_linked_tmpfile(self, path: Path, data: bytes) -> bool:
+        """
+        Write data to an unnamed O_TMPFILE inode and link it in at path.
+        
+        The file only becomes visible once fully written. Linux-only; callers
+        fall back to a regular write when this returns False. Errors showing
+        the filesystem can't do this disable the O_TMPFILE path for the rest
+        of the process; other errors only affect the current write.
+        
+        Args:
+            path: Destination path inside the code directory
+            data: File content
+            
+        Returns:
+            True if the file was written, False if the caller should fall back
+        """
+        if not self._use_tmpfile:
+            return False
+        
+        dir_fd = None
+        fd = None
+        stage = "open"
+        try:
+            dir_fd = os.open(path.parent, os.O_RDONLY | os.O_DIRECTORY)
+            
+            stage = "tmpfile"
+            fd = os.open(".", os.O_TMPFILE | os.O_WRONLY, 0o600, dir_fd=dir_fd)
+            
+            stage = "write"
+            view = memoryview(data)
+            while view:
+                written = os.write(fd, view)
+                view = view[written:]
+            
+            # Passing dst_dir_fd makes CPython call linkat(..., AT_SYMLINK_FOLLOW);
+            # plain link(2) on the /proc magic link fails with EXDEV
+            stage = "link"
+            os.link(f"/proc/self/fd/{fd}", path.name, dst_dir_fd=dir_fd, follow_symlinks=True)
+            return True
+        except OSError as e:
+            if e.errno in _TMPFILE_UNSUPPORTED_ERRNOS.get(stage, ()):
+                logger.warning(f"O_TMPFILE unsupported here, using regular writes: {e}")
+                self._use_tmpfile = False
+            else:
+                logger.warning(f"O_TMPFILE write failed, falling back for this file: {e}")
+            return False
+        finally:
+            if fd is not None:
+                os.close(fd)
+            if dir_fd is not None:
+                os.close(dir_fd)
+    
     def _get_scene_class_name(self, code: str) -> str:
         """
         Extract Scene class name from Manim code.
@@ -109,21 +265,16 @@ class RenderService:
         Returns:
             Scene class name
         """
-        import re
-        
-        # Look for class that inherits from Scene
-        pattern = r'class\s+(\w+)\s*\(\s*Scene\s*\)'
-        match = re.search(pattern, code)
-        
-        if match:
-            return match.group(1)
-        
-        # Fallback: look for any class definition
-        pattern = r'class\s+(\w+)\s*\('
-        match = re.search(pattern, code)
+        # Single scan: prefer a class inheriting from Scene, else the first class
+        fallback = None
+        for match in _CLASS_RE.finditer(code):
+            if match.group(2):
+                return match.group(1)
+            if fallback is None:
+                fallback = match.group(1)
         
-        if match:
-            return match.group(1)
+        if fallback:
+            return fallback
         
         raise ValueError("No Scene class found in code")
     
@@ -139,10 +290,12 @@ class RenderService:
         Returns:
             True if successful, False otherwise
         """
+        process = None
+        
         try:
             # Construct Manim command
             cmd = [
-                "manim",
+                self._manim_bin,
                 str(code_path),
                 scene_class,
                 f"--quality={config.MANIM_QUALITY.lower()}",
@@ -153,27 +306,38 @@ class RenderService:
             
             logger.info(f"Executing Manim command: {' '.join(cmd)}")
             
+            # Stdout is only worth capturing when debug logging will show it
+            capture_stdout = logger.isEnabledFor(logging.DEBUG)
+            
             # Execute with timeout
             process = await asyncio.create_subprocess_exec(
                 *cmd,
-                stdout=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE if capture_stdout else asyncio.subprocess.DEVNULL,
                 stderr=asyncio.subprocess.PIPE,
                 cwd=self.videos_dir  # Run in videos directory
             )
             
-            stdout, stderr = await asyncio.wait_for(
-                process.communicate(),
+            # Drain output into bounded buffers while waiting for exit
+            stdout, stderr, _ = await asyncio.wait_for(
+                asyncio.gather(
+                    _read_tail(process.stdout),
+                    _read_tail(process.stderr),
+                    process.wait()
+                ),
                 timeout=config.RENDER_TIMEOUT_SEC
             )
             
             # Check if process succeeded
             if process.returncode == 0:
                 logger.info(f"Manim render successful: {output_path}")
+                if capture_stdout:
+                    logger.debug(f"Stdout: {stdout.decode(errors='replace')}")
                 return True
             else:
                 logger.error(f"Manim render failed with code {process.returncode}")
-                logger.error(f"Stdout: {stdout.decode()}")
-                logger.error(f"Stderr: {stderr.decode()}")
+                if capture_stdout:
+                    logger.error(f"Stdout: {stdout.decode(errors='replace')}")
+                logger.error(f"Stderr: {stderr.decode(errors='replace')}")
                 return False
                 
         except asyncio.TimeoutError:
@@ -182,6 +346,11 @@ class RenderService:
         except Exception as e:
             logger.error(f"Manim render exception: {e}")
             return False
+        finally:
+            # Kill and reap Manim if it is still running (timeout or error)
+            if process and process.returncode is None:
+                process.kill()
+                await process.wait()
     
     def create_render_job(self, filename: str, code: str) -> RenderJob:
         """
@@ -195,7 +364,7 @@ class RenderService:
             RenderJob with job ID and initial status
         """
         job_id = self._generate_job_id()
-        current_time = datetime.utcnow().isoformat()
+        current_time = time.time()
         
         # Create job record
         job_store = JobStore(
@@ -208,6 +377,7 @@ class RenderService:
         )
         
         self.job_store.add_job(job_store)
+        self._events[job_id] = asyncio.Event()
         
         logger.info(f"Created render job {job_id} for filename: {filename}")
         
@@ -231,20 +401,23 @@ class RenderService:
         job = enhanced_job_store.get_job(job_id)
         if not job:
             logger.error(f"Job {job_id} not found")
+            self._notify_completion(job_id)
             return
         
+        code_path = None
+        
         try:
             logger.info(f"Starting render job {job_id}")
             
             # Update status to rendering
             self.job_store.update_job(job_id, status="rendering")
             
+            # Extract scene class name before anything is written
+            scene_class = self._get_scene_class_name(job.code)
+            
             # Save code to file
             code_path = self._save_code_file(job.filename, job.code)
             
-            # Extract scene class name
-            scene_class = self._get_scene_class_name(job.code)
-            
             # Prepare output path
             video_path = self._get_safe_filepath(job.filename, ".mp4")
             
@@ -259,18 +432,47 @@ class RenderService:
                 # Render failed
                 self.job_store.update_job(job_id, status="error", error_message="Manim rendering failed")
                 logger.error(f"Render job {job_id} failed")
-            
-            # Cleanup code file
-            try:
-                code_path.unlink()
-                logger.info(f"Cleaned up code file: {code_path}")
-            except Exception as e:
-                logger.warning(f"Failed to cleanup code file: {e}")
                 
         except Exception as e:
             # Handle any unexpected errors
             self.job_store.update_job(job_id, status="error", error_message=f"Render processing error: {str(e)}")
             logger.error(f"Render job {job_id} processing error: {e}")
+        finally:
+            # Cleanup code file, including when rendering errored out
+            if code_path:
+                try:
+                    code_path.unlink()
+                    logger.info(f"Cleaned up code file: {code_path}")
+                except Exception as e:
+                    logger.warning(f"Failed to cleanup code file: {e}")
+            
+            self._notify_completion(job_id)
+    
+    def _notify_completion(self, job_id: str):
+        """Wake any clients waiting on a job."""
+        event = self._events.get(job_id)
+        if event:
+            event.set()
+    
+    async def await_completion(self, job_id: str, timeout: float) -> Optional[RenderJob]:
+        """
+        Wait for a render job to finish.
+        
+        Args:
+            job_id: Job identifier
+            timeout: Maximum time to wait in seconds
+            
+        Returns:
+            RenderJob with status at completion (or at timeout), None if not found
+        """
+        event = self._events.get(job_id)
+        if event:
+            try:
+                await asyncio.wait_for(event.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                logger.info(f"Timed out waiting for job {job_id} after {timeout}s")
+        
+        return self.get_job_status(job_id)
     
     def get_job_status(self, job_id: str) -> Optional[RenderJob]:
         """
@@ -305,8 +507,35 @@ class RenderService:
         
         Args:
             max_age_hours: Maximum age of jobs to keep
+            
+        Returns:
+            Number of jobs cleaned up
         """
-        return self.job_store.cleanup_old_jobs(max_age_hours)
+        jobs_cleaned = self.job_store.cleanup_old_jobs(max_age_hours)
+        
+        # Drop completion events for jobs no longer in the store
+        for job_id in [job_id for job_id in self._events if not self.job_store.get_job(job_id)]:
+            del self._events[job_id]
+        
+        # Remove stale rendered files; DirEntry.stat() reuses the directory scan
+        cutoff = time.time() - max_age_hours * 3600
+        files_removed = 0
+        
+        try:
+            with os.scandir(self.videos_dir) as it:
+                for entry in it:
+                    if entry.name == ".gitkeep" or not entry.is_file(follow_symlinks=False):
+                        continue
+                    if entry.stat(follow_symlinks=False).st_mtime < cutoff:
+                        os.unlink(entry.path)
+                        files_removed += 1
+        except OSError as e:
+            logger.warning(f"Failed to cleanup video files: {e}")
+        
+        if files_removed:
+            logger.info(f"Cleaned up {files_removed} old video files")
+        
+        return jobs_cleaned
     
     def get_job_stats(self) -> Dict[str, int]:
         """Get statistics about current jobs."""
@@ -4,6 +4,7 @@ Implements server-side validation rules and security measures.
 """
 import re
 import time
+import string
 import logging
 from typing import Dict, List, Set
 from collections import defaultdict, deque
@@ -11,6 +12,12 @@ from datetime import datetime, timedelta
 
 logger = logging.getLogger(__name__)
 
+# Deletes every allowed filename character; anything left over is invalid
+_FILENAME_DELETE_TABLE = str.maketrans('', '', string.ascii_letters + string.digits + '_-')
+
+# Maps C0/C1 control characters (\x00-\x1f, \x7f-\x9f) to None for str.translate
+_CONTROL_CHAR_TABLE = dict.fromkeys([*range(0x00, 0x20), *range(0x7f, 0xa0)])
+
 class ValidationService:
     """Service for validating inputs and enforcing safety rules."""
     
@@ -32,6 +39,9 @@ class ValidationService:
         'input(', 'raw_input('
     }
     
+    # Pre-encoded keywords for substring scans over the encoded code buffer
+    _DANGEROUS_KEYWORD_BYTES = tuple((keyword, keyword.encode()) for keyword in DANGEROUS_KEYWORDS)
+    
     @classmethod
     def validate_topic(cls, topic: str) -> str:
         """
@@ -60,7 +70,7 @@ class ValidationService:
             raise ValueError("Topic must be no more than 120 characters long")
         
         # Remove control characters
-        topic = re.sub(r'[\x00-\x1f\x7f-\x9f]', '', topic)
+        topic = topic.translate(_CONTROL_CHAR_TABLE)
         
         # Check for potentially malicious content
         suspicious_patterns = [
@@ -111,7 +121,7 @@ class ValidationService:
             raise ValueError("Filename must be no more than 50 characters")
         
         # Allow only safe characters: letters, numbers, underscores, hyphens
-        if not re.match(r'^[a-zA-Z0-9_-]+$', filename):
+        if filename.translate(_FILENAME_DELETE_TABLE):
             raise ValueError("Filename can only contain letters, numbers, underscores, and hyphens")
         
         # Prevent reserved names
@@ -156,8 +166,20 @@ class ValidationService:
         if len(code) > 5000:
             raise ValueError("Code exceeds maximum length of 5000 characters")
         
-        # Convert to lowercase for pattern matching
+        # Convert to lowercase for pattern matching; substring checks run on the
+        # UTF-8 bytes, where ASCII needles match exactly as they do in the str
         code_lower = code.lower()
+        code_lower_b = code_lower.encode('utf-8')
+        
+        # Ensure it looks like Manim code (cheap checks first to reject early)
+        if b'from manim import' not in code_lower_b and b'import manim' not in code_lower_b:
+            raise ValueError("Code must import manim")
+        
+        if b'class ' not in code_lower_b:
+            raise ValueError("Code must define a Scene class")
+        
+        if b'def construct' not in code_lower_b:
+            raise ValueError("Code must have a construct method")
         
         # Check for dangerous imports
         import_pattern = r'(?:^|\n)\s*(?:import|from)\s+([^\s\n]+)'
@@ -170,8 +192,8 @@ class ValidationService:
                 raise ValueError(f"Dangerous import detected: {imp}")
         
         # Check for dangerous keywords/functions
-        for keyword in cls.DANGEROUS_KEYWORDS:
-            if keyword in code_lower:
+        for keyword, keyword_b in cls._DANGEROUS_KEYWORD_BYTES:
+            if keyword_b in code_lower_b:
                 raise ValueError(f"Dangerous function detected: {keyword.rstrip('(')}")
         
         # Check for file operations
@@ -189,27 +211,17 @@ class ValidationService:
         
         # Check for network operations
         network_patterns = [
-            r'urllib',
-            r'requests',
-            r'http',
-            r'socket',
-            r'urllib2',
+            b'urllib',
+            b'requests',
+            b'http',
+            b'socket',
+            b'urllib2',
         ]
         
         for pattern in network_patterns:
-            if pattern in code_lower:
+            if pattern in code_lower_b:
                 raise ValueError("Network operations are not allowed in animation code")
         
-        # Ensure it looks like Manim code
-        if 'from manim import' not in code_lower and 'import manim' not in code_lower:
-            raise ValueError("Code must import manim")
-        
-        if 'class ' not in code_lower:
-            raise ValueError("Code must define a Scene class")
-        
-        if 'def construct' not in code_lower:
-            raise ValueError("Code must have a construct method")
-        
         return code
     
     @classmethod
@@ -268,7 +280,7 @@ class ValidationService:
             raise ValueError("Lesson plan guidance must be no more than 500 characters")
         
         # Remove control characters
-        plan = re.sub(r'[\x00-\x1f\x7f-\x9f]', '', plan)
+        plan = plan.translate(_CONTROL_CHAR_TABLE)
         
         return plan
     
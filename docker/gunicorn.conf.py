@@ -9,15 +9,18 @@ bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
 backlog = 2048
 
 # Worker processes
-workers = int(os.getenv('WORKERS', multiprocessing.cpu_count() * 2))
-worker_class = "uvicorn.workers.UvicornWorker"
-worker_connections = 1000
-max_requests = 1000
-max_requests_jitter = 100
+# Async workers each handle many connections, so one per core (+1) is enough
+workers = int(os.getenv('WORKERS', multiprocessing.cpu_count() + 1))
+worker_class = "uvicorn.workers.UvicornWorker"  # Picks uvloop/httptools automatically when installed
+max_requests = 0  # Disable worker recycling; restarts cause latency spikes
+max_requests_jitter = 0
 
 # Timeouts
-timeout = 30
-keepalive = 5
+timeout = 60
+# UvicornWorker passes this to uvicorn as timeout_keep_alive (uvicorn's own
+# default is 5s); keep it above the proxy's idle timeout (60s on common load
+# balancers) so the proxy, not the app, closes idle connections
+keepalive = 75
 graceful_timeout = 30
 
 # Process naming
@@ -61,6 +64,10 @@ def pre_fork(server, worker):
 
 def post_fork(server, worker):
     """Called just after a worker has been forked."""
+    # preload_app created the Gemini client in the master; rebuild it per worker
+    # so forked processes don't share the parent's connection
+    from app.services.gemini_service import gemini_service
+    gemini_service.configure_client()
     server.log.info(f"🎯 Worker {worker.pid} ready")
 
 def worker_abort(worker):
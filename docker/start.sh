@@ -9,14 +9,14 @@ if [ -z "$GEMINI_API_KEY" ]; then
     exit 1
 fi
 
-# Set default values
-export WORKERS=${WORKERS:-4}
+# Set default values (worker count comes from gunicorn.conf.py, which
+# reads WORKERS if set and otherwise uses CPU count + 1)
 export HOST=${HOST:-0.0.0.0}
 export PORT=${PORT:-8000}
 export LOG_LEVEL=${LOG_LEVEL:-info}
 
 echo "📋 Configuration:"
-echo "  Workers: $WORKERS"
+echo "  Workers: ${WORKERS:-CPU count + 1}"
 echo "  Host: $HOST"
 echo "  Port: $PORT"
 echo "  Log Level: $LOG_LEVEL"
@@ -53,7 +53,6 @@ else
     exec gunicorn app.main:app \
         --config gunicorn.conf.py \
         --bind $HOST:$PORT \
-        --workers $WORKERS \
         --worker-class uvicorn.workers.UvicornWorker \
         --access-logfile - \
         --error-logfile - \
@@ -13,6 +13,19 @@ from app.main import app
 import uvicorn
 from app.config import config
 
+# Use the C-backed event loop and HTTP parser when available
+try:
+    import uvloop
+    LOOP = "uvloop"
+except ImportError:
+    LOOP = "asyncio"
+
+try:
+    import httptools
+    HTTP = "httptools"
+except ImportError:
+    HTTP = "h11"
+
 if __name__ == "__main__":
     print("Starting AI Tutor Backend Server...")
     try:
@@ -21,6 +34,9 @@ if __name__ == "__main__":
             host=config.HOST,
             port=config.PORT,
             reload=config.DEBUG,
+            loop=LOOP,
+            http=HTTP,
+            interface="asgi3",
             log_level=config.LOG_LEVEL.lower()
         )
     except KeyboardInterrupt:
@@ -1,6 +1,10 @@
+#!/usr/bin/env python3
 """
 Testing Guide for AI Tutor Backend API.
 Provides curl commands and examples for testing all endpoints.
+Kept outside the app package so the server never imports it.
+
+Usage: python tools/testing_guide.py  (writes test_api.sh)
 """
 
 # Test data for API endpoints
@@ -241,4 +245,7 @@ def save_test_script():
     print("Test script saved as test_api.sh")
     print("Run with: chmod +x test_api.sh && ./test_api.sh")
 
+if __name__ == "__main__":
+    save_test_script()
+
 